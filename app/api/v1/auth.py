@@ -95,11 +95,16 @@ async def get_current_user(
 
 
 async def get_current_session(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
 ) -> Session:
     """Get the current session ID from the token.
 
+    The session's user ID is also stored on the request state so the rate limiter
+    can key limits by user instead of by client IP.
+
     Args:
+        request: The FastAPI request object.
         credentials: The HTTP authorization credentials containing the JWT token.
 
     Returns:
@@ -134,6 +139,7 @@ async def get_current_session(
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
+        request.state.user_id = session.user_id
         return session
     except ValueError as ve:
         logger.error("token_validation_failed", error=str(ve), exc_info=True)
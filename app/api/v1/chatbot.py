@@ -4,35 +4,142 @@ This module provides endpoints for chat interactions, including regular chat,
 streaming chat, message history management, and chat history clearing.
 """
 
-import json
-from typing import List
+import asyncio
+from collections import defaultdict
+from contextlib import aclosing
+from typing import (
+    Callable,
+    Dict,
+    List,
+    Optional,
+)
 
+import httpx
+import orjson
 from fastapi import (
     APIRouter,
     Depends,
     HTTPException,
+    Query,
     Request,
 )
-from fastapi.responses import StreamingResponse
+from fastapi.responses import (
+    ORJSONResponse,
+    StreamingResponse,
+)
+from starlette.background import BackgroundTask
 
 from app.api.v1.auth import get_current_session
 from app.core.config import settings
 from app.core.langraph.graph import LangGraphAgent
 from app.core.langraph.tools.web_scraper import analyze_news_impact
-from app.core.limiter import limiter
-from app.core.logging import logger
+from app.core.limiter import (
+    estimate_tokens,
+    get_rate_limit_key,
+    limiter,
+    token_limiter,
+)
+from app.core.logging import (
+    logger,
+    sample_request_log,
+)
 from app.models.session import Session
 from app.schemas.chat import (
+    ChatHistoryResponse,
     ChatRequest,
     ChatResponse,
     Message,
     StreamResponse,
     NewsImpactRequest,
-    NewsImpactResponse,
+)
+from app.utils import (
+    bounded_stream,
+    dump_messages,
 )
 
 router = APIRouter()
-agent = LangGraphAgent()
+
+# Shared async client for Ollama so LLM calls don't block the event loop and reuse
+# kept-alive connections (multiplexed over HTTP/2 when the server supports it)
+ollama_client = httpx.AsyncClient(
+    base_url=settings.OLLAMA_BASE_URL,
+    http2=True,
+    timeout=httpx.Timeout(60.0),
+    limits=httpx.Limits(max_connections=64, max_keepalive_connections=64),
+)
+
+# Dynamic batching of streamed tokens: start flushing every token for a fast
+# first byte, then grow the batch so long answers need far fewer SSE frames
+STREAM_MIN_BATCH_SIZE = 1
+STREAM_MAX_BATCH_SIZE = 50
+STREAM_BATCH_GROWTH_FACTOR = 3
+STREAM_FLUSH_INTERVAL = 0.05  # seconds
+
+# Back-pressure between the LLM and slow clients: at most this many chunks are
+# held per stream, and a client that drains nothing for this long is dropped
+STREAM_QUEUE_SIZE = 16
+STREAM_PUT_TIMEOUT = 30.0  # seconds
+
+# Words of article text put into the news impact prompt. At roughly six characters a
+# word this bounds the prompt's cost, so the token bucket is charged before the fetch
+NEWS_MAX_WORDS = 500
+NEWS_ARTICLE_TOKENS = NEWS_MAX_WORDS * 6 // 4
+
+# Pagination of the chat history endpoint
+MESSAGES_PAGE_SIZE = 50
+MESSAGES_MAX_PAGE_SIZE = 200
+
+# Number of streaming responses currently open per user in this worker
+_active_streams: Dict[int, int] = defaultdict(int)
+
+# Server-sent event framing, kept as bytes so orjson output is yielded as-is
+_SSE_PREFIX = b"data: "
+_SSE_SUFFIX = b"\n\n"
+_SSE_DONE_FRAME = _SSE_PREFIX + orjson.dumps(StreamResponse(content="", done=True).model_dump()) + _SSE_SUFFIX
+
+
+def _reserve_stream(user_id: int) -> Callable[[], None]:
+    """Reserve one of the user's concurrent stream slots in this worker.
+
+    The check and the increment run without an await in between, so concurrent
+    requests can't both pass the check before either is counted.
+
+    Args:
+        user_id: The ID of the user opening the stream.
+
+    Returns:
+        Callable[[], None]: Releases the slot; calling it more than once is a no-op.
+
+    Raises:
+        HTTPException: If the user already has the maximum number of open streams.
+    """
+    if _active_streams.get(user_id, 0) >= settings.MAX_CONCURRENT_STREAMS_PER_USER:
+        raise HTTPException(status_code=429, detail="Too many concurrent streams")
+    _active_streams[user_id] += 1
+    released = False
+
+    def release() -> None:
+        nonlocal released
+        if released:
+            return
+        released = True
+        _active_streams[user_id] -= 1
+        if not _active_streams[user_id]:
+            del _active_streams[user_id]
+
+    return release
+
+
+def get_agent(request: Request) -> LangGraphAgent:
+    """Get the LangGraph agent created in the application lifespan.
+
+    Args:
+        request: The FastAPI request object.
+
+    Returns:
+        LangGraphAgent: The agent shared by all requests in this worker.
+    """
+    return request.app.state.agent
 
 
 @router.post("/chat", response_model=ChatResponse)
@@ -41,6 +148,7 @@ async def chat(
     request: Request,
     chat_request: ChatRequest,
     session: Session = Depends(get_current_session),
+    agent: LangGraphAgent = Depends(get_agent),
 ):
     """Process a chat request using LangGraph.
 
@@ -48,87 +156,123 @@ async def chat(
         request: The FastAPI request object for rate limiting.
         chat_request: The chat request containing messages.
         session: The current session from the auth token.
+        agent: The LangGraph agent for this worker.
 
     Returns:
-        ChatResponse: The processed chat response.
+        ORJSONResponse: The processed chat response, shaped like ChatResponse.
 
     Raises:
-        HTTPException: If there's an error processing the request.
+        HTTPException: If there's an error processing the request or the token rate limit is exceeded.
     """
     try:
-        logger.info(
-            "chat_request_received",
-            session_id=session.id,
-            message_count=len(chat_request.messages),
-        )
+        await token_limiter.check(get_rate_limit_key(request), estimate_tokens(m.content for m in chat_request.messages))
+
+        if sample_request_log():
+            logger.info(
+                "chat_request_received",
+                session_id=session.id,
+                message_count=len(chat_request.messages),
+            )
 
         # Process the request through the LangGraph
         result = await agent.get_response(chat_request.messages, session.id, user_id=session.user_id)
 
-        logger.info("chat_request_processed", session_id=session.id)
+        logger.debug("chat_request_processed", session_id=session.id)
 
-        return ChatResponse(messages=result)
+        # Serialized once by orjson, skipping FastAPI's response model validation and jsonable_encoder
+        return ORJSONResponse({"messages": dump_messages(result)})
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error("chat_request_failed", session_id=session.id, error=str(e), exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 
-import requests
-
-@router.post("/news/impact", response_model=NewsImpactResponse)
+@router.post("/news/impact")
 @limiter.limit(settings.RATE_LIMIT_ENDPOINTS["chat"][0])
 async def analyze_news_impact_endpoint(
     request: Request,
     news_request: NewsImpactRequest,
-    # session: Session = Depends(get_current_session),
+    session: Session = Depends(get_current_session),
 ):
-    """Analyze the potential impact of a news article using Ollama LLM API directly."""
+    """Analyze the potential impact of a news article using Ollama LLM API directly.
+
+    The article text is scraped and sent to Ollama in the prompt, and the Ollama
+    output is streamed token by token as server-sent events, so the client starts
+    receiving the analysis as soon as generation begins.
+
+    Args:
+        request: The FastAPI request object for rate limiting.
+        news_request: The news impact request containing the URL and field.
+        session: The current session from the auth token.
+
+    Returns:
+        StreamingResponse: A streaming response of the impact analysis.
+
+    Raises:
+        HTTPException: If the article can't be extracted, there's an error processing the
+            request or the token rate limit is exceeded.
+    """
     try:
-        # Compose the prompt for LLM
-        prompt = (
-            f"Analyze the potential impact of this news article on the {news_request.field} sector. "
-            f"URL: {news_request.url}\n"
-            f"Please extract the main content and provide:\n"
-            f"- Key events or developments\n- Potential short-term and long-term consequences\n- Specific insights related to {news_request.field}"
+        # Charge the worst-case prompt up front so over-budget callers don't trigger a scrape
+        await token_limiter.check(
+            get_rate_limit_key(request), estimate_tokens([news_request.field]) + NEWS_ARTICLE_TOKENS
         )
-        ollama_url = "http://localhost:11434/v1/chat/completions"
+
+        # Compose the prompt for LLM from the article text
+        prompt = await analyze_news_impact(str(news_request.url), news_request.field, max_words=NEWS_MAX_WORDS)
+        if prompt is None:
+            raise HTTPException(status_code=400, detail="Unable to extract or analyze the news article content.")
+        ollama_url = "/api/chat"
         payload = {
-            "model": "deepseek-r1:1.5b",  # or your preferred model name
+            "model": settings.OLLAMA_MODEL,
             "messages": [
                 {"role": "user", "content": prompt}
             ],
-            "stream": False
+            "stream": True
         }
-        response = requests.post(ollama_url, json=payload, timeout=60)
-        response.raise_for_status()
-        data = response.json()
-        llm_content = data["choices"][0]["message"]["content"]
-        return NewsImpactResponse(content=llm_content)
-    except Exception as e:
-        logger.error("news_impact_failed", error=str(e), exc_info=True)
-        raise HTTPException(status_code=500, detail="Failed to analyze news impact: " + str(e))
 
-    try:
-        # logger.info(
-        #     "news_impact_request_received",
-        #     session_id=session.id,
-        #     url=news_request.url,
-        #     field=news_request.field,
-        # )
-
-        # Analyze the news impact
-        question = analyze_news_impact(str(news_request.url), news_request.field)
-        # result = await agent.get_response(question)
-
-        if question is None:
-            raise HTTPException(status_code=400, detail="Unable to extract or analyze the news article content.")
+        async def event_generator():
+            """Forward Ollama's NDJSON stream as server-sent events.
 
-    #     logger.info("news_impact_request_processed", session_id=session.id)
+            The stream always ends with a done frame, also when Ollama reports an
+            error mid-stream or closes the connection without a final chunk.
 
-        return NewsImpactResponse(content=question)
+            Yields:
+                bytes: Server-sent events in JSON format.
+            """
+            try:
+                async with ollama_client.stream("POST", ollama_url, json=payload) as response:
+                    response.raise_for_status()
+                    async for line in response.aiter_lines():
+                        if not line:
+                            continue
+                        chunk = orjson.loads(line)
+                        if chunk.get("error"):
+                            logger.error("news_impact_failed", error=chunk["error"])
+                            error_response = StreamResponse(
+                                content="Failed to analyze news impact: " + str(chunk["error"]), done=True
+                            )
+                            yield _SSE_PREFIX + orjson.dumps(error_response.model_dump()) + _SSE_SUFFIX
+                            return
+                        content = chunk.get("message", {}).get("content", "")
+                        done = chunk.get("done", False)
+                        yield _SSE_PREFIX + orjson.dumps({"content": content, "done": done}) + _SSE_SUFFIX
+                        if done:
+                            return
+                # Ollama closed the stream without a done chunk
+                yield _SSE_DONE_FRAME
+            except Exception as e:
+                logger.error("news_impact_failed", error=str(e), exc_info=True)
+                error_response = StreamResponse(content="Failed to analyze news impact: " + str(e), done=True)
+                yield _SSE_PREFIX + orjson.dumps(error_response.model_dump()) + _SSE_SUFFIX
+
+        return StreamingResponse(event_generator(), media_type="text/event-stream")
+    except HTTPException:
+        raise
     except Exception as e:
-    #     logger.error("news_impact_request_failed", session_id=session.id, error=str(e), exc_info=True)
-        raise HTTPException(status_code=500, detail=str(e))
+        logger.error("news_impact_failed", error=str(e), exc_info=True)
+        raise HTTPException(status_code=500, detail="Failed to analyze news impact: " + str(e))
 
 
 @router.post("/chat/stream")
@@ -137,6 +281,7 @@ async def chat_stream(
     request: Request,
     chat_request: ChatRequest,
     session: Session = Depends(get_current_session),
+    agent: LangGraphAgent = Depends(get_agent),
 ):
     """Process a chat request using LangGraph with streaming response.
 
@@ -144,41 +289,66 @@ async def chat_stream(
         request: The FastAPI request object for rate limiting.
         chat_request: The chat request containing messages.
         session: The current session from the auth token.
+        agent: The LangGraph agent for this worker.
 
     Returns:
         StreamingResponse: A streaming response of the chat completion.
 
     Raises:
-        HTTPException: If there's an error processing the request.
+        HTTPException: If there's an error processing the request, the user has too many
+            open streams or the token rate limit is exceeded.
     """
+    release_stream = _reserve_stream(session.user_id)
     try:
-        logger.info(
-            "stream_chat_request_received",
-            session_id=session.id,
-            message_count=len(chat_request.messages),
-        )
+        await token_limiter.check(get_rate_limit_key(request), estimate_tokens(m.content for m in chat_request.messages))
+
+        if sample_request_log():
+            logger.info(
+                "stream_chat_request_received",
+                session_id=session.id,
+                message_count=len(chat_request.messages),
+            )
 
         async def event_generator():
             """Generate streaming events.
 
             Yields:
-                str: Server-sent events in JSON format.
+                bytes: Server-sent events in JSON format.
 
             Raises:
                 Exception: If there's an error during streaming.
             """
             try:
-                full_response = ""
-                async for chunk in agent.get_stream_response(
-                    chat_request.messages, session.id, user_id=session.user_id
-                ):
-                    full_response += chunk
-                    response = StreamResponse(content=chunk, done=False)
-                    yield f"data: {json.dumps(response.model_dump())}\n\n"
+                loop = asyncio.get_running_loop()
+                buffer: list[str] = []
+                batch_size = STREAM_MIN_BATCH_SIZE
+                last_flush = loop.time()
+                # aclosing() stops the LLM stream as soon as we stop reading from it
+                async with aclosing(
+                    bounded_stream(
+                        agent.get_stream_response(chat_request.messages, session.id, user_id=session.user_id),
+                        maxsize=STREAM_QUEUE_SIZE,
+                        put_timeout=STREAM_PUT_TIMEOUT,
+                    )
+                ) as stream:
+                    async for chunk in stream:
+                        buffer.append(chunk)
+                        if len(buffer) >= batch_size or loop.time() - last_flush > STREAM_FLUSH_INTERVAL:
+                            # Stop generating for clients that went away mid-stream
+                            if await request.is_disconnected():
+                                logger.info("stream_chat_client_disconnected", session_id=session.id)
+                                return
+                            yield _SSE_PREFIX + orjson.dumps({"content": "".join(buffer), "done": False}) + _SSE_SUFFIX
+                            buffer.clear()
+                            batch_size = min(batch_size * STREAM_BATCH_GROWTH_FACTOR, STREAM_MAX_BATCH_SIZE)
+                            last_flush = loop.time()
+
+                # Flush whatever is left before the completion frame
+                if buffer:
+                    yield _SSE_PREFIX + orjson.dumps({"content": "".join(buffer), "done": False}) + _SSE_SUFFIX
 
                 # Send final message indicating completion
-                final_response = StreamResponse(content="", done=True)
-                yield f"data: {json.dumps(final_response.model_dump())}\n\n"
+                yield _SSE_DONE_FRAME
 
             except Exception as e:
                 logger.error(
@@ -188,11 +358,20 @@ async def chat_stream(
                     exc_info=True,
                 )
                 error_response = StreamResponse(content=str(e), done=True)
-                yield f"data: {json.dumps(error_response.model_dump())}\n\n"
+                yield _SSE_PREFIX + orjson.dumps(error_response.model_dump()) + _SSE_SUFFIX
+            finally:
+                release_stream()
 
-        return StreamingResponse(event_generator(), media_type="text/event-stream")
+        # The background task also releases the slot if the body is never iterated
+        return StreamingResponse(
+            event_generator(), media_type="text/event-stream", background=BackgroundTask(release_stream)
+        )
 
+    except HTTPException:
+        release_stream()
+        raise
     except Exception as e:
+        release_stream()
         logger.error(
             "stream_chat_request_failed",
             session_id=session.id,
@@ -202,43 +381,96 @@ async def chat_stream(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/messages", response_model=ChatResponse)
+@router.get("/messages", response_model=ChatHistoryResponse)
 @limiter.limit(settings.RATE_LIMIT_ENDPOINTS["messages"][0])
 async def get_session_messages(
     request: Request,
+    before: Optional[int] = Query(None, ge=0, description="Cursor returned as next_cursor by the previous page"),
+    limit: int = Query(MESSAGES_PAGE_SIZE, ge=1, le=MESSAGES_MAX_PAGE_SIZE),
     session: Session = Depends(get_current_session),
+    agent: LangGraphAgent = Depends(get_agent),
 ):
-    """Get all messages for a session.
+    """Get one page of messages for a session, starting from the most recent.
 
     Args:
         request: The FastAPI request object for rate limiting.
+        before: Cursor from a previous page; only older messages are returned.
+        limit: The maximum number of messages to return.
         session: The current session from the auth token.
+        agent: The LangGraph agent for this worker.
 
     Returns:
-        ChatResponse: All messages in the session.
+        ORJSONResponse: The page of messages, shaped like ChatHistoryResponse.
 
     Raises:
         HTTPException: If there's an error retrieving the messages.
     """
     try:
-        messages = await agent.get_chat_history(session.id)
-        return ChatResponse(messages=messages)
+        messages, next_cursor = await agent.get_chat_history_page(session.id, limit=limit, before=before)
+        return ORJSONResponse({"messages": dump_messages(messages), "next_cursor": next_cursor})
     except Exception as e:
         logger.error("get_messages_failed", session_id=session.id, error=str(e), exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/messages/export", response_model=ChatResponse)
+@limiter.limit(settings.RATE_LIMIT_ENDPOINTS["messages"][0])
+async def export_session_messages(
+    request: Request,
+    session: Session = Depends(get_current_session),
+    agent: LangGraphAgent = Depends(get_agent),
+):
+    """Stream all messages for a session as a single JSON document.
+
+    Messages are serialized one at a time, so the full JSON payload is never
+    built in memory.
+
+    Args:
+        request: The FastAPI request object for rate limiting.
+        session: The current session from the auth token.
+        agent: The LangGraph agent for this worker.
+
+    Returns:
+        StreamingResponse: All messages in the session, shaped like ChatResponse.
+
+    Raises:
+        HTTPException: If there's an error retrieving the messages.
+    """
+    try:
+        messages = await agent.get_chat_history(session.id)
+
+        async def json_generator():
+            """Generate the JSON document row by row.
+
+            Yields:
+                bytes: Fragments of the JSON document.
+            """
+            yield b'{"messages":['
+            for index, message in enumerate(messages):
+                yield (b"," if index else b"") + orjson.dumps(message.model_dump())
+            yield b"]}"
+
+        return StreamingResponse(
+            json_generator(), media_type="application/json", headers={"Cache-Control": "no-transform"}
+        )
+    except Exception as e:
+        logger.error("export_messages_failed", session_id=session.id, error=str(e), exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.delete("/messages")
 @limiter.limit(settings.RATE_LIMIT_ENDPOINTS["messages"][0])
 async def clear_chat_history(
     request: Request,
     session: Session = Depends(get_current_session),
+    agent: LangGraphAgent = Depends(get_agent),
 ):
     """Clear all messages for a session.
 
     Args:
         request: The FastAPI request object for rate limiting.
         session: The current session from the auth token.
+        agent: The LangGraph agent for this worker.
 
     Returns:
         dict: A message indicating the chat history was cleared.
@@ -154,6 +154,22 @@ class Settings:
         self.MAX_TOKENS = int(os.getenv("MAX_TOKENS", "2000"))
         self.MAX_LLM_CALL_RETRIES = int(os.getenv("MAX_LLM_CALL_RETRIES", "3"))
 
+        # Ollama Configuration (news impact analysis)
+        self.OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+        self.OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "deepseek-r1:1.5b")
+
+        # History summarization: once the unsummarized history exceeds SUMMARY_TRIGGER_TOKENS,
+        # everything but the last SUMMARY_KEEP_MESSAGES messages is folded into a summary.
+        # The trigger is capped below the MAX_TOKENS trim budget (which also counts per-message
+        # overhead) so messages are summarized before the trim could drop them unsummarized
+        self.SUMMARY_LLM_MODEL = os.getenv("SUMMARY_LLM_MODEL", "gpt-4o-mini")
+        self.SUMMARY_TRIGGER_TOKENS = min(
+            int(os.getenv("SUMMARY_TRIGGER_TOKENS", str(self.MAX_TOKENS * 3 // 4))), self.MAX_TOKENS
+        )
+        self.SUMMARY_KEEP_MESSAGES = int(os.getenv("SUMMARY_KEEP_MESSAGES", "6"))
+        self.SUMMARY_MAX_TOKENS = int(os.getenv("SUMMARY_MAX_TOKENS", "400"))
+        self.SUMMARY_CACHE_TTL = int(os.getenv("SUMMARY_CACHE_TTL", "86400"))  # seconds
+
         # JWT Configuration
         self.JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "")
         self.JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
@@ -163,6 +179,8 @@ class Settings:
         self.LOG_DIR = Path(os.getenv("LOG_DIR", "logs"))
         self.LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
         self.LOG_FORMAT = os.getenv("LOG_FORMAT", "json")  # "json" or "console"
+        # Fraction of high-volume per-request events (e.g. chat_request_received) that are logged
+        self.LOG_REQUEST_SAMPLE_RATE = float(os.getenv("LOG_REQUEST_SAMPLE_RATE", "1.0"))
 
         # Postgres Configuration
         self.POSTGRES_URL = os.getenv("POSTGRES_URL", "")
@@ -170,9 +188,21 @@ class Settings:
         self.POSTGRES_MAX_OVERFLOW = int(os.getenv("POSTGRES_MAX_OVERFLOW", "10"))
         self.CHECKPOINT_TABLES = ["checkpoint_blobs", "checkpoint_writes", "checkpoints"]
 
+        # Redis Configuration
+        self.REDIS_URL = os.getenv("REDIS_URL", "")
+
         # Rate Limiting Configuration
+        self.RATE_LIMIT_STORAGE_URI = os.getenv("RATE_LIMIT_STORAGE_URI", self.REDIS_URL or "memory://")
+        self.RATE_LIMIT_STRATEGY = os.getenv("RATE_LIMIT_STRATEGY", "moving-window")
         self.RATE_LIMIT_DEFAULT = parse_list_from_env("RATE_LIMIT_DEFAULT", ["200 per day", "50 per hour"])
 
+        # Token bucket for LLM endpoints, in estimated LLM tokens
+        self.TOKEN_LIMIT_CAPACITY = int(os.getenv("TOKEN_LIMIT_CAPACITY", "60000"))
+        self.TOKEN_LIMIT_REFILL_RATE = float(os.getenv("TOKEN_LIMIT_REFILL_RATE", "1000"))  # tokens per second
+
+        # Concurrent streaming responses allowed per user
+        self.MAX_CONCURRENT_STREAMS_PER_USER = int(os.getenv("MAX_CONCURRENT_STREAMS_PER_USER", "3"))
+
         # Rate limit endpoints defaults
         default_endpoints = {
             "chat": ["30 per minute"],
@@ -192,6 +222,12 @@ class Settings:
             if value:
                 self.RATE_LIMIT_ENDPOINTS[endpoint] = value
 
+        # News Scraper Configuration
+        self.NEWS_CACHE_MAXSIZE = int(os.getenv("NEWS_CACHE_MAXSIZE", "1024"))
+        self.NEWS_CACHE_TTL = int(os.getenv("NEWS_CACHE_TTL", "600"))  # seconds
+        self.NEWS_MAX_BYTES = int(os.getenv("NEWS_MAX_BYTES", str(2 * 1024 * 1024)))
+        self.NEWS_TOOL_TIMEOUT = float(os.getenv("NEWS_TOOL_TIMEOUT", "15"))  # seconds
+
         # Evaluation Configuration
         self.EVALUATION_LLM = os.getenv("EVALUATION_LLM", "gpt-4o-mini")
         self.EVALUATION_BASE_URL = os.getenv("EVALUATION_BASE_URL", "https://api.openai.com/v1")
@@ -213,11 +249,13 @@ class Settings:
             Environment.STAGING: {
                 "DEBUG": False,
                 "LOG_LEVEL": "INFO",
+                "LOG_REQUEST_SAMPLE_RATE": 0.1,
                 "RATE_LIMIT_DEFAULT": ["500 per day", "100 per hour"],
             },
             Environment.PRODUCTION: {
                 "DEBUG": False,
                 "LOG_LEVEL": "WARNING",
+                "LOG_REQUEST_SAMPLE_RATE": 0.01,
                 "RATE_LIMIT_DEFAULT": ["200 per day", "50 per hour"],
             },
             Environment.TEST: {
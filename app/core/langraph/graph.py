@@ -1,5 +1,6 @@
 """This file contains the LangGraph Agent/workflow and interactions with the LLM."""
 
+import asyncio
 from typing import (
     Any,
     AsyncGenerator,
@@ -11,12 +12,15 @@ from typing import (
 from asgiref.sync import sync_to_async
 from langchain_core.messages import (
     BaseMessage,
+    HumanMessage,
+    SystemMessage,
     ToolMessage,
     convert_to_openai_messages,
 )
 from langchain_openai import ChatOpenAI
 from langfuse.callback import CallbackHandler
 from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+from langgraph.constants import TAG_NOSTREAM
 from langgraph.graph import (
     END,
     StateGraph,
@@ -37,11 +41,19 @@ from app.schemas import (
     GraphState,
     Message,
 )
+from app.services.cache import cache_service
 from app.utils import (
+    count_tokens,
     dump_messages,
     prepare_messages,
 )
 
+SUMMARY_PROMPT = (
+    "Summarize the conversation below in a few sentences. Keep the facts, names, decisions and open "
+    "questions the assistant needs to continue the conversation. If a previous summary is given, "
+    "merge it into the new one."
+)
+
 
 class LangGraphAgent:
     """Manages the LangGraph Agent/workflow and interactions with the LLM.
@@ -60,12 +72,38 @@ class LangGraphAgent:
             max_tokens=settings.MAX_TOKENS,
             **self._get_model_kwargs(),
         ).bind_tools(tools)
+        # Cheap model used to fold old history into a summary; tagged so its tokens stay out of /chat/stream
+        self.summary_llm = ChatOpenAI(
+            model=settings.SUMMARY_LLM_MODEL,
+            temperature=0,
+            api_key=settings.LLM_API_KEY,
+            max_tokens=settings.SUMMARY_MAX_TOKENS,
+        ).with_config(tags=[TAG_NOSTREAM])
         self.tools_by_name = {tool.name: tool for tool in tools}
         self._connection_pool: Optional[AsyncConnectionPool] = None
         self._graph: Optional[CompiledStateGraph] = None
 
         logger.info("llm_initialized", model=settings.LLM_MODEL, environment=settings.ENVIRONMENT.value)
 
+    async def ainit(self) -> None:
+        """Eagerly build the graph and its connection pool at application startup.
+
+        Failures are logged and the graph is built lazily on the first request instead,
+        so the API can still start (and report itself degraded) without a database.
+        """
+        try:
+            await self.create_graph()
+        except Exception as e:
+            logger.warning("graph_init_deferred", error=str(e), environment=settings.ENVIRONMENT.value)
+
+    async def aclose(self) -> None:
+        """Release the PostgreSQL connection pool at application shutdown."""
+        if self._connection_pool is not None:
+            await self._connection_pool.close()
+            self._connection_pool = None
+            self._graph = None
+            logger.info("connection_pool_closed", environment=settings.ENVIRONMENT.value)
+
     def _get_model_kwargs(self) -> Dict[str, Any]:
         """Get environment-specific model kwargs.
 
@@ -118,6 +156,63 @@ class LangGraphAgent:
                 raise e
         return self._connection_pool
 
+    async def summarize(self, messages: list[BaseMessage], previous_summary: Optional[str] = None) -> str:
+        """Summarize messages with the summary LLM.
+
+        Args:
+            messages (list[BaseMessage]): The messages to summarize.
+            previous_summary (Optional[str]): Summary of the messages before these ones.
+
+        Returns:
+            str: The summary of the previous summary and the messages.
+        """
+        transcript = "\n".join(f"{message.type}: {message.content}" for message in messages)
+        if previous_summary:
+            transcript = f"Previous summary: {previous_summary}\n\n{transcript}"
+        response = await self.summary_llm.ainvoke([SystemMessage(SUMMARY_PROMPT), HumanMessage(transcript)])
+        return str(response.content)
+
+    async def _prune_history(self, state: GraphState) -> tuple[list[BaseMessage], Optional[str]]:
+        """Replace old messages with a summary once the history gets too long.
+
+        The summary is cached per session together with the ID of the last message it covers,
+        so it is only regenerated after another SUMMARY_TRIGGER_TOKENS worth of messages.
+
+        Args:
+            state (GraphState): The current state of the conversation.
+
+        Returns:
+            tuple[list[BaseMessage], Optional[str]]: The messages to send verbatim and the
+                summary of the ones before them, if any.
+        """
+        messages = state.messages
+        cache_key = f"history_summary:{state.session_id}"
+        cached = await cache_service.get_json(cache_key)
+
+        # Only trust the summary if the message it ends at is still in the same place
+        summary, start = None, 0
+        if cached and cached["upto"] <= len(messages) and messages[cached["upto"] - 1].id == cached["upto_id"]:
+            summary, start = cached["summary"], cached["upto"]
+
+        if count_tokens(messages[start:]) <= settings.SUMMARY_TRIGGER_TOKENS:
+            return messages[start:], summary
+
+        # Start the verbatim part on a human message so tool calls stay paired with their results
+        split = len(messages) - settings.SUMMARY_KEEP_MESSAGES
+        while split > start and messages[split].type != "human":
+            split -= 1
+        if split <= start:
+            return messages[start:], summary
+
+        summary = await self.summarize(messages[start:split], previous_summary=summary)
+        await cache_service.set_json(
+            cache_key,
+            {"summary": summary, "upto": split, "upto_id": messages[split - 1].id},
+            ttl=settings.SUMMARY_CACHE_TTL,
+        )
+        logger.info("history_summarized", session_id=state.session_id, summarized_messages=split)
+        return messages[split:], summary
+
     async def _chat(self, state: GraphState) -> dict:
         """Process the chat state and generate a response.
 
@@ -127,7 +222,8 @@ class LangGraphAgent:
         Returns:
             dict: Updated state with new messages.
         """
-        messages = prepare_messages(state.messages, self.llm, SYSTEM_PROMPT)
+        history, summary = await self._prune_history(state)
+        messages = prepare_messages(history, self.llm, SYSTEM_PROMPT, summary=summary)
 
         llm_calls_num = 0
 
@@ -178,16 +274,19 @@ class LangGraphAgent:
         Returns:
             Dict with updated messages containing tool responses.
         """
-        outputs = []
-        for tool_call in state.messages[-1].tool_calls:
-            tool_result = await self.tools_by_name[tool_call["name"]].ainvoke(tool_call["args"])
-            outputs.append(
-                ToolMessage(
-                    content=tool_result,
-                    name=tool_call["name"],
-                    tool_call_id=tool_call["id"],
-                )
+        tool_calls = state.messages[-1].tool_calls
+        # Run independent tool calls concurrently, e.g. several articles scraped at once
+        tool_results = await asyncio.gather(
+            *(self.tools_by_name[tool_call["name"]].ainvoke(tool_call["args"]) for tool_call in tool_calls)
+        )
+        outputs = [
+            ToolMessage(
+                content=tool_result,
+                name=tool_call["name"],
+                tool_call_id=tool_call["id"],
             )
+            for tool_call, tool_result in zip(tool_calls, tool_results, strict=True)
+        ]
         return {"messages": outputs}
 
     def _should_continue(self, state: GraphState) -> Literal["end", "continue"]:
@@ -352,6 +451,25 @@ class LangGraphAgent:
         )
         return self.__process_messages(state.values["messages"]) if state.values else []
 
+    async def get_chat_history_page(
+        self, session_id: str, limit: int, before: Optional[int] = None
+    ) -> tuple[list[Message], Optional[int]]:
+        """Get one page of the chat history, newest messages first.
+
+        Args:
+            session_id (str): The session ID for the conversation.
+            limit (int): The maximum number of messages to return.
+            before (Optional[int]): Cursor from a previous page; only messages before it are returned.
+
+        Returns:
+            tuple[list[Message], Optional[int]]: The messages in chronological order and the
+                cursor for the previous page, or None if there are no older messages.
+        """
+        messages = await self.get_chat_history(session_id)
+        end = len(messages) if before is None else min(before, len(messages))
+        start = max(0, end - limit)
+        return messages[start:end], start or None
+
     def __process_messages(self, messages: list[BaseMessage]) -> list[Message]:
         openai_style_messages = convert_to_openai_messages(messages)
         # keep just assistant and user messages
@@ -384,6 +502,8 @@ class LangGraphAgent:
                         logger.error(f"Error clearing {table}", error=str(e))
                         raise
 
+            await cache_service.delete(f"history_summary:{session_id}")
+
         except Exception as e:
             logger.error("Failed to clear chat history", error=str(e))
             raise
\ No newline at end of file
@@ -1,125 +1,326 @@
-import requests
-from bs4 import BeautifulSoup
+import asyncio
+import ipaddress
 import re
-from typing import Optional, Dict, Any
+import socket
+from typing import Optional, Any
+
+import httpx
+from async_lru import alru_cache
+from selectolax.lexbor import LexborHTMLParser, LexborNode
 from langchain_core.tools import BaseTool
 from langchain_core.pydantic_v1 import BaseModel, Field
 
+from app.core.config import settings
+from app.core.logging import logger
+
+# Send requests with a user agent to mimic a browser
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept-Encoding': 'gzip, br',
+}
+
+# Class/id names that usually mark the main article container (also covers e.g. main-content)
+_CONTENT_PATTERN = re.compile(r'article|content', re.I)
+
+# Main content containers, resolved in a single pass over the document
+_CONTENT_SELECTOR = (
+    'article, div[class*="article" i], div[class*="content" i], '
+    'div[id*="article" i], div[id*="content" i], body'
+)
+
+# Text inside these tags is never part of the article body
+_SKIPPED_TAGS = {'script', 'style', 'noscript'}
+
+
+class UnsafeURLError(ValueError):
+    """Raised when a news URL (or a redirect target) resolves to a non-public address."""
+
+async def _resolve_public_address(host: str, port: int) -> str:
+    """Resolve a host, refusing loopback, private, link-local and otherwise non-public addresses.
+
+    Args:
+        host (str): Host name or IP address to resolve
+        port (int): Port that will be connected to
+
+    Returns:
+        str: The address to connect to
+
+    Raises:
+        UnsafeURLError: If any address of the host is non-public
+        OSError: If the host can't be resolved
+    """
+    addresses = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    for *_, sockaddr in addresses:
+        ip = ipaddress.ip_address(sockaddr[0])
+        if isinstance(ip, ipaddress.IPv6Address) and ip.ipv4_mapped:
+            ip = ip.ipv4_mapped
+        if not ip.is_global or ip.is_multicast:
+            raise UnsafeURLError(f'refusing to fetch {host}: resolves to non-public address {ip}')
+    return addresses[0][4][0]
+
+class _PublicHostTransport(httpx.AsyncBaseTransport):
+    """Transport that only connects to public addresses.
+
+    The host is resolved and checked once and the request is sent to that same address,
+    so DNS answers that change between the check and the connect (rebinding) can't point
+    it elsewhere. The original host is kept for the Host header, TLS SNI and certificate
+    check. The client sends every redirect hop through the transport, so each is checked.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        port = request.url.port or (443 if request.url.scheme == 'https' else 80)
+        try:
+            address = await _resolve_public_address(host, port)
+        except OSError as e:
+            raise httpx.ConnectError(str(e), request=request) from e
+
+        pinned = httpx.Request(
+            request.method,
+            request.url.copy_with(host=address),
+            headers=request.headers,
+            stream=request.stream,
+            extensions={**request.extensions, 'sni_hostname': host},
+        )
+        return await self._transport.handle_async_request(pinned)
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+def _new_scraper_client() -> httpx.AsyncClient:
+    """Create an HTTP client configured for fetching news articles.
+
+    Returns:
+        httpx.AsyncClient: Client that follows redirects and refuses non-public hosts
+    """
+    # Proxies from the environment are ignored, they would bypass the address check
+    return httpx.AsyncClient(
+        transport=_PublicHostTransport(httpx.AsyncHTTPTransport(http2=True)),
+        follow_redirects=True,
+        headers=HEADERS,
+        timeout=10,
+        trust_env=False,
+    )
+
+# Shared client so fetches reuse connections and the SSL context is built once
+scraper_client = _new_scraper_client()
+
+
 class NewsImpactInput(BaseModel):
     """Input for news impact analysis."""
     url: str = Field(description="URL of the news article to analyze")
     field: str = Field(description="Field to analyze impact on (e.g., finance, technology)")
 
-def extract_news_content(url: str, max_words: int = 500) -> Optional[str]:
+def _candidate_rank(node: LexborNode) -> int:
+    """Rank a content candidate, lower is better.
+
+    Args:
+        node (LexborNode): Node matched by _CONTENT_SELECTOR
+
+    Returns:
+        int: 0 for <article>, 1 for a matching div class, 2 for a matching div id, 3 for <body>
+    """
+    if node.tag == 'article':
+        return 0
+    if node.tag == 'body':
+        return 3
+    if _CONTENT_PATTERN.search(node.attributes.get('class') or ''):
+        return 1
+    return 2
+
+def _extract_words(node: LexborNode, max_words: int) -> str:
+    """Collect up to max_words words from the text nodes below a node.
+
+    Stops walking the DOM as soon as enough words have been collected.
+
+    Args:
+        node (LexborNode): Node to extract text from
+        max_words (int): Maximum number of words to extract
+
+    Returns:
+        str: The extracted words joined by single spaces
+    """
+    words: list[str] = []
+    for child in node.traverse(include_text=True):
+        if child.tag != '-text' or (child.parent and child.parent.tag in _SKIPPED_TAGS):
+            continue
+        words.extend((child.text_content or '').split()[:max_words - len(words)])
+        if len(words) >= max_words:
+            break
+    return ' '.join(words)
+
+def _extract_main_content(html: bytes, max_words: int) -> Optional[str]:
+    """Extract the main article text from an HTML document.
+
+    Args:
+        html (bytes): Raw (possibly truncated) HTML document
+        max_words (int): Maximum number of words to extract
+
+    Returns:
+        Optional[str]: Extracted article content or None if no content was found
+    """
+    tree = LexborHTMLParser(html)
+
+    # Try candidates best first (earliest in the document on ties); the first with any text wins
+    for candidate in sorted(tree.css(_CONTENT_SELECTOR), key=_candidate_rank):
+        text = _extract_words(candidate, max_words)
+        if text:
+            return text
+
+    return None
+
+async def _download_news_content(client: httpx.AsyncClient, url: str, max_words: int) -> Optional[str]:
+    """Download and parse a news article.
+
+    Args:
+        client (httpx.AsyncClient): Client to fetch the article with
+        url (str): URL of the news article
+        max_words (int): Maximum number of words to extract
+
+    Returns:
+        Optional[str]: Extracted article content or None if no content was found
     """
-    Extract main content from a news article URL.
-    
+    # Stream the (transparently decompressed) body and stop reading once it is large
+    # enough; the article text is near the top and the parser copes with truncated HTML
+    html = bytearray()
+    async with client.stream('GET', url) as response:
+        response.raise_for_status()
+        async for chunk in response.aiter_bytes():
+            html += chunk
+            if len(html) >= settings.NEWS_MAX_BYTES:
+                break
+
+    return _extract_main_content(bytes(html), max_words)
+
+@alru_cache(maxsize=settings.NEWS_CACHE_MAXSIZE, ttl=settings.NEWS_CACHE_TTL)
+async def _fetch_news_content(url: str, max_words: int) -> Optional[str]:
+    """Download and parse a news article with the shared client, caching the result per (url, max_words).
+
+    Failures raise instead of returning None so that they are never cached.
+
+    Args:
+        url (str): URL of the news article
+        max_words (int): Maximum number of words to extract
+
+    Returns:
+        Optional[str]: Extracted article content or None if no content was found
+    """
+    return await _download_news_content(scraper_client, url, max_words)
+
+async def extract_news_content(
+    url: str, max_words: int = 500, client: Optional[httpx.AsyncClient] = None
+) -> Optional[str]:
+    """Extract main content from a news article URL.
+
+    Results fetched with the shared client are cached in-process for settings.NEWS_CACHE_TTL seconds.
+
     Args:
         url (str): URL of the news article
         max_words (int, optional): Maximum number of words to extract. Defaults to 500.
-    
+        client (httpx.AsyncClient, optional): Client to fetch with instead of the shared, cached one.
+
     Returns:
         Optional[str]: Extracted article content or None if extraction fails
     """
     try:
-        # Send a request with a user agent to mimic a browser
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        
-        # Parse the HTML
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Try multiple strategies to extract main content
-        content_candidates = [
-            soup.find('article'),
-            soup.find('div', class_=re.compile(r'(article|content|main-content)', re.I)),
-            soup.find('div', id=re.compile(r'(article|content|main-content)', re.I)),
-            soup.find('body')
-        ]
-        
-        # Find the first non-None content
-        for candidate in content_candidates:
-            if candidate:
-                # Extract text, remove extra whitespace
-                text = ' '.join(candidate.get_text(strip=True).split())
-                
-                # Limit to max_words
-                words = text.split()[:max_words]
-                return ' '.join(words)
-        
-        return None
-    
-    except (requests.RequestException, ValueError) as e:
-        print(f"Error extracting content from {url}: {e}")
+        if client is not None:
+            return await _download_news_content(client, url, max_words)
+        return await _fetch_news_content(url, max_words)
+    except (httpx.HTTPError, ValueError) as e:
+        logger.warning("news_content_extraction_failed", url=url, error=str(e))
         return None
 
-def analyze_news_impact(url: str, field: str, max_words: int = 500) -> Optional[str]:
-    """
-    Extract news content and prepare it for impact analysis.
-    
+async def analyze_news_impact(
+    url: str, field: str, max_words: int = 500, client: Optional[httpx.AsyncClient] = None
+) -> Optional[str]:
+    """Extract news content and prepare it for impact analysis.
+
     Args:
         url (str): URL of the news article
         field (str): Field to analyze impact on (e.g., finance, technology)
         max_words (int, optional): Maximum number of words to extract. Defaults to 500.
-    
+        client (httpx.AsyncClient, optional): Client to fetch with instead of the shared, cached one.
+
     Returns:
         Optional[str]: Prepared content for impact analysis or None if extraction fails
     """
-    content = extract_news_content(url, max_words)
+    content = await extract_news_content(url, max_words, client)
     if not content:
         return None
-    
+
     # Prepare a prompt for impact analysis
     impact_prompt = f"""
     News Content: {content}
-    
+
     Analyze the potential impact of this news on the {field} sector:
     - Identify key events or developments
     - Explain potential short-term and long-term consequences
     - Provide specific insights related to {field}
     """
-    
+
     return impact_prompt
 
 class NewsImpactTool(BaseTool):
     """Tool for analyzing news impact on a specific field."""
-    
+
     name: str = "news_impact_analysis"
     description: str = "Analyze the potential impact of a news article on a specific field"
     args_schema: type[BaseModel] = NewsImpactInput
 
-    def _run(
-        self, 
-        url: str, 
-        field: str, 
-        **kwargs: Any
-    ) -> str:
-        """
-        Run the news impact analysis.
-        
+    async def _analyze(self, url: str, field: str, client: Optional[httpx.AsyncClient] = None) -> str:
+        """Analyze a news article, bounded so a slow site can't stall the agent loop.
+
         Args:
             url (str): URL of the news article
             field (str): Field to analyze impact on
-        
+            client (httpx.AsyncClient, optional): Client to fetch with instead of the shared, cached one
+
         Returns:
             str: Analysis of the news article's impact
         """
-        # Call the analysis function
-        result = analyze_news_impact(url, field)
-        
+        try:
+            async with asyncio.timeout(settings.NEWS_TOOL_TIMEOUT):
+                result = await analyze_news_impact(url, field, client=client)
+        except TimeoutError:
+            logger.warning("news_impact_tool_timeout", url=url, timeout=settings.NEWS_TOOL_TIMEOUT)
+            result = None
+
         if result is None:
             return "Unable to extract or analyze the news article content."
-        
+
         return result
 
+    def _run(
+        self,
+        url: str,
+        field: str,
+        **kwargs: Any
+    ) -> str:
+        """Run the news impact analysis.
+
+        Args:
+            url (str): URL of the news article
+            field (str): Field to analyze impact on
+
+        Returns:
+            str: Analysis of the news article's impact
+        """
+        # The shared client and the cache are bound to the app's event loop, so sync
+        # callers fetch with a short-lived client on an event loop of their own
+        async def analyze_with_own_client() -> str:
+            async with _new_scraper_client() as client:
+                return await self._analyze(url, field, client)
+
+        return asyncio.run(analyze_with_own_client())
+
     async def _arun(
-        self, 
-        url: str, 
-        field: str, 
+        self,
+        url: str,
+        field: str,
         **kwargs: Any
     ) -> str:
         """Async version of _run method."""
-        return self._run(url, field, **kwargs)
\ No newline at end of file
+        return await self._analyze(url, field)
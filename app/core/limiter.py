@@ -1,14 +1,174 @@
 """Rate limiting configuration for the application.
 
 This module configures rate limiting using slowapi, with default limits
-defined in the application settings. Rate limits are applied based on
-remote IP addresses.
+defined in the application settings. Rate limits are applied per user when
+the request is authenticated and per remote IP address otherwise.
+
+Counters live in the storage given by RATE_LIMIT_STORAGE_URI (Redis when
+REDIS_URL is set) so that limits are shared by all workers, and the
+moving-window strategy avoids the 2x burst a fixed window allows at its edges.
+
+LLM endpoints are additionally limited by a token bucket that charges each
+request its estimated token cost rather than a flat count of one.
 """
 
+import math
+import time
+from collections import OrderedDict
+from typing import (
+    Iterable,
+    Tuple,
+)
+
+from fastapi import (
+    HTTPException,
+    Request,
+)
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
 from app.core.config import settings
+from app.services.cache import cache_service
+
+# Refill and charge a bucket atomically, returning the seconds to wait (0 if granted).
+# The result is returned as a string because Redis truncates Lua numbers to integers.
+_TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local refill_rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'last_refill')
+local tokens = tonumber(bucket[1]) or capacity
+local last_refill = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - last_refill) * refill_rate)
+local retry_after = 0
+if tokens >= cost then
+    tokens = tokens - cost
+else
+    retry_after = (cost - tokens) / refill_rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'last_refill', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / refill_rate) + 1)
+return tostring(retry_after)
+"""
+
+
+def get_rate_limit_key(request: Request) -> str:
+    """Get the rate limit key for a request.
+
+    Args:
+        request: The FastAPI request object.
+
+    Returns:
+        str: The authenticated user ID if known, otherwise the client IP address.
+    """
+    user_id = getattr(request.state, "user_id", None)
+    if user_id is not None:
+        return f"user:{user_id}"
+    return get_remote_address(request)
+
+
+# Initialize rate limiter; if the shared storage is unreachable, limits are counted
+# in process instead of failing every limited route (including login)
+limiter = Limiter(
+    key_func=get_rate_limit_key,
+    default_limits=settings.RATE_LIMIT_DEFAULT,
+    storage_uri=settings.RATE_LIMIT_STORAGE_URI,
+    strategy=settings.RATE_LIMIT_STRATEGY,
+    in_memory_fallback_enabled=True,
+)
+
+
+def estimate_tokens(texts: Iterable[str]) -> int:
+    """Estimate the LLM token cost of a request.
+
+    Args:
+        texts: The prompt texts, e.g. the content of each message.
+
+    Returns:
+        int: Roughly four characters per prompt token plus the completion budget.
+    """
+    return sum(len(text) for text in texts) // 4 + settings.MAX_TOKENS
+
+
+class TokenBucket:
+    """Token bucket limiter charging each request its estimated LLM token cost.
+
+    Buckets are stored in Redis when it is configured so that all workers share
+    them, and in process memory otherwise.
+    """
+
+    def __init__(self, capacity: int, refill_rate: float, prefix: str = "token_bucket", local_maxsize: int = 10000):
+        """Initialize the token bucket.
+
+        Args:
+            capacity: Maximum number of tokens a bucket can hold.
+            refill_rate: Tokens added back to a bucket per second.
+            prefix: Prefix for the Redis keys of the buckets.
+            local_maxsize: Maximum number of buckets kept in process when Redis is not configured.
+        """
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self.prefix = prefix
+        self._buckets: OrderedDict[str, Tuple[float, float]] = OrderedDict()
+        self._local_maxsize = local_maxsize
+        self._script = None
+
+    def _acquire_local(self, key: str, cost: float) -> float:
+        now = time.monotonic()
+        tokens, last_refill = self._buckets.get(key, (self.capacity, now))
+        tokens = min(self.capacity, tokens + (now - last_refill) * self.refill_rate)
+        retry_after = 0.0
+        if tokens >= cost:
+            tokens -= cost
+        else:
+            retry_after = (cost - tokens) / self.refill_rate
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        # Evicting the least recently used bucket only refills it early
+        if len(self._buckets) > self._local_maxsize:
+            self._buckets.popitem(last=False)
+        return retry_after
+
+    async def acquire(self, key: str, cost: int) -> float:
+        """Try to take tokens from a bucket.
+
+        Args:
+            key: The bucket key, as returned by get_rate_limit_key.
+            cost: The number of tokens to take. Capped at the bucket capacity.
+
+        Returns:
+            float: 0 if the tokens were taken, otherwise the seconds until they are available.
+        """
+        cost = min(cost, self.capacity)
+        client = cache_service.client
+        if client is None:
+            return self._acquire_local(key, cost)
+
+        if self._script is None:
+            self._script = client.register_script(_TOKEN_BUCKET_SCRIPT)
+        retry_after = await self._script(keys=[f"{self.prefix}:{key}"], args=[self.capacity, self.refill_rate, cost])
+        return float(retry_after)
+
+    async def check(self, key: str, cost: int) -> None:
+        """Take tokens from a bucket or reject the request.
+
+        Args:
+            key: The bucket key, as returned by get_rate_limit_key.
+            cost: The number of tokens to take.
+
+        Raises:
+            HTTPException: 429 with a Retry-After header if the bucket has too few tokens.
+        """
+        retry_after = await self.acquire(key, cost)
+        if retry_after > 0:
+            raise HTTPException(
+                status_code=429,
+                detail="Token rate limit exceeded",
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+
 
-# Initialize rate limiter
-limiter = Limiter(key_func=get_remote_address, default_limits=settings.RATE_LIMIT_DEFAULT)
\ No newline at end of file
+# Initialize token limiter for LLM endpoints
+token_limiter = TokenBucket(capacity=settings.TOKEN_LIMIT_CAPACITY, refill_rate=settings.TOKEN_LIMIT_REFILL_RATE)
@@ -7,6 +7,7 @@ console-friendly development logging and JSON-formatted production logging.
 
 import json
 import logging
+import random
 import sys
 from datetime import datetime
 from pathlib import Path
@@ -169,6 +170,18 @@ def setup_logging() -> None:
         )
 
 
+def sample_request_log() -> bool:
+    """Decide whether to emit a log line for a high-volume per-request event.
+
+    Lets hot paths skip building the event entirely when it would be dropped
+    anyway, and keeps only a sample of it otherwise.
+
+    Returns:
+        bool: True if INFO logs are enabled and the event falls in the LOG_REQUEST_SAMPLE_RATE sample.
+    """
+    return logging.getLogger().isEnabledFor(logging.INFO) and random.random() < settings.LOG_REQUEST_SAMPLE_RATE
+
+
 # Initialize logging
 setup_logging()
 
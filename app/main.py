@@ -17,17 +17,24 @@ from fastapi import (
 )
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import (
+    JSONResponse,
+    ORJSONResponse,
+)
 from langfuse import Langfuse
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 
 from app.api.v1.api import api_router
+from app.api.v1.chatbot import ollama_client
 from app.core.config import settings
+from app.core.langraph.graph import LangGraphAgent
+from app.core.langraph.tools.web_scraper import scraper_client
 from app.core.limiter import limiter
 from app.core.logging import logger
 from app.core.metrics import setup_metrics
 from app.core.middleware import MetricsMiddleware
+from app.services.cache import cache_service
 from app.services.database import database_service
 
 # Load environment variables
@@ -50,7 +57,14 @@ async def lifespan(app: FastAPI):
         version=settings.VERSION,
         api_prefix=settings.API_V1_STR,
     )
+    # Build the agent once per worker; routes get it through the get_agent dependency
+    app.state.agent = LangGraphAgent()
+    await app.state.agent.ainit()
     yield
+    await app.state.agent.aclose()
+    await ollama_client.aclose()
+    await scraper_client.aclose()
+    await cache_service.aclose()
     logger.info("application_shutdown")
 
 
@@ -60,6 +74,7 @@ app = FastAPI(
     description=settings.DESCRIPTION,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # Set up Prometheus metrics
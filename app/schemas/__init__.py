@@ -2,6 +2,7 @@
 
 from app.schemas.auth import Token
 from app.schemas.chat import (
+    ChatHistoryResponse,
     ChatRequest,
     ChatResponse,
     Message,
@@ -11,6 +12,7 @@ from app.schemas.graph import GraphState
 
 __all__ = [
     "Token",
+    "ChatHistoryResponse",
     "ChatRequest",
     "ChatResponse",
     "Message",
@@ -4,6 +4,7 @@ import re
 from typing import (
     List,
     Literal,
+    Optional,
 )
 
 from pydantic import (
@@ -94,6 +95,18 @@ class ChatResponse(BaseModel):
     messages: List[Message] = Field(..., description="List of messages in the conversation")
 
 
+class ChatHistoryResponse(BaseModel):
+    """Response model for one page of the chat history.
+
+    Attributes:
+        messages: The messages of this page, in chronological order.
+        next_cursor: Cursor to pass as `before` for the previous page, or None if this is the first page.
+    """
+
+    messages: List[Message] = Field(..., description="The messages of this page, in chronological order")
+    next_cursor: Optional[int] = Field(default=None, description="Cursor for the page of older messages")
+
+
 class StreamResponse(BaseModel):
     """Response model for streaming chat endpoint.
 
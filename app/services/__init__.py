@@ -1,5 +1,6 @@
 """This file contains the services for the application."""
 
+from app.services.cache import cache_service
 from app.services.database import database_service
 
-__all__ = ["database_service"]
\ No newline at end of file
+__all__ = ["cache_service", "database_service"]
\ No newline at end of file
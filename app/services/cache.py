@@ -0,0 +1,103 @@
+"""This file contains the Redis cache service for the application."""
+
+import time
+from collections import OrderedDict
+from typing import (
+    Any,
+    Optional,
+    Tuple,
+)
+
+import orjson
+from redis.asyncio import Redis
+
+from app.core.config import settings
+from app.core.logging import logger
+
+
+class CacheService:
+    """Service class for the shared Redis connection.
+
+    The client is created lazily on first use. When REDIS_URL is not configured
+    the service has no client and callers fall back to in-process state; the
+    JSON helpers below do that fallback themselves with a small bounded LRU.
+    """
+
+    def __init__(self, local_maxsize: int = 1024):
+        """Initialize the cache service without connecting.
+
+        Args:
+            local_maxsize: Maximum number of entries kept in process when Redis is not configured.
+        """
+        self._client: Optional[Redis] = None
+        self._local: OrderedDict[str, Tuple[float, Any]] = OrderedDict()
+        self._local_maxsize = local_maxsize
+
+    @property
+    def client(self) -> Optional[Redis]:
+        """Get the shared Redis client.
+
+        Returns:
+            Optional[Redis]: The Redis client, or None if REDIS_URL is not set.
+        """
+        if self._client is None and settings.REDIS_URL:
+            self._client = Redis.from_url(settings.REDIS_URL, decode_responses=True)
+            logger.info("redis_client_created", environment=settings.ENVIRONMENT.value)
+        return self._client
+
+    async def get_json(self, key: str) -> Optional[Any]:
+        """Get a JSON value from the cache.
+
+        Args:
+            key: The cache key.
+
+        Returns:
+            Optional[Any]: The cached value, or None if it is missing or expired.
+        """
+        if self.client is not None:
+            value = await self.client.get(key)
+            return orjson.loads(value) if value is not None else None
+
+        entry = self._local.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            self._local.pop(key, None)
+            return None
+        self._local.move_to_end(key)
+        return entry[1]
+
+    async def set_json(self, key: str, value: Any, ttl: int) -> None:
+        """Store a JSON-serializable value in the cache.
+
+        Args:
+            key: The cache key.
+            value: The value to store.
+            ttl: Seconds until the value expires.
+        """
+        if self.client is not None:
+            await self.client.set(key, orjson.dumps(value), ex=ttl)
+            return
+
+        self._local[key] = (time.monotonic() + ttl, value)
+        self._local.move_to_end(key)
+        if len(self._local) > self._local_maxsize:
+            self._local.popitem(last=False)
+
+    async def delete(self, key: str) -> None:
+        """Remove a value from the cache.
+
+        Args:
+            key: The cache key.
+        """
+        if self.client is not None:
+            await self.client.delete(key)
+        else:
+            self._local.pop(key, None)
+
+    async def aclose(self) -> None:
+        """Close the Redis connection pool."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+cache_service = CacheService()
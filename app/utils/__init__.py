@@ -1,8 +1,10 @@
 """This file contains the utilities for the application."""
 
 from .graph import (
+    count_tokens,
     dump_messages,
     prepare_messages,
 )
+from .streaming import bounded_stream
 
-__all__ = ["dump_messages", "prepare_messages"]
\ No newline at end of file
+__all__ = ["bounded_stream", "count_tokens", "dump_messages", "prepare_messages"]
\ No newline at end of file
@@ -1,5 +1,12 @@
 """This file contains the graph utilities for the application."""
 
+from functools import lru_cache
+from typing import (
+    Any,
+    Optional,
+)
+
+import tiktoken
 from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_core.messages import trim_messages as _trim_messages
 
@@ -19,13 +26,38 @@ def dump_messages(messages: list[Message]) -> list[dict]:
     return [message.model_dump() for message in messages]
 
 
-def prepare_messages(messages: list[Message], llm: BaseChatModel, system_prompt: str) -> list[Message]:
+@lru_cache(maxsize=1)
+def _get_encoding() -> tiktoken.Encoding:
+    """Get the tiktoken encoding of the configured LLM, loaded once per process."""
+    try:
+        return tiktoken.encoding_for_model(settings.LLM_MODEL)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+
+def count_tokens(messages: list[Any]) -> int:
+    """Count the tokens in the content of the messages.
+
+    Args:
+        messages (list[Any]): The messages to count, Message or LangChain BaseMessage objects.
+
+    Returns:
+        int: The number of content tokens, ignoring per-message formatting overhead.
+    """
+    encoding = _get_encoding()
+    return sum(len(encoding.encode(str(message.content))) for message in messages)
+
+
+def prepare_messages(
+    messages: list[Message], llm: BaseChatModel, system_prompt: str, summary: Optional[str] = None
+) -> list[Message]:
     """Prepare the messages for the LLM.
 
     Args:
         messages (list[Message]): The messages to prepare.
         llm (BaseChatModel): The LLM to use.
         system_prompt (str): The system prompt to use.
+        summary (Optional[str]): Summary of older messages that are no longer sent verbatim.
 
     Returns:
         list[Message]: The prepared messages.
@@ -39,4 +71,8 @@ def prepare_messages(messages: list[Message], llm: BaseChatModel, system_prompt:
         include_system=False,
         allow_partial=False,
     )
-    return [Message(role="system", content=system_prompt)] + trimmed_messages
\ No newline at end of file
+    prefix = [Message(role="system", content=system_prompt)]
+    if summary:
+        # Message content is capped at 3000 characters
+        prefix.append(Message(role="system", content=f"Summary of the earlier conversation: {summary}"[:3000]))
+    return prefix + trimmed_messages
\ No newline at end of file
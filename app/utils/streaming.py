@@ -0,0 +1,65 @@
+"""This file contains the streaming utilities for the application."""
+
+import asyncio
+from typing import (
+    AsyncGenerator,
+    AsyncIterator,
+    Optional,
+    TypeVar,
+)
+
+T = TypeVar("T")
+
+_END = object()
+
+
+async def bounded_stream(source: AsyncIterator[T], maxsize: int, put_timeout: float) -> AsyncGenerator[T, None]:
+    """Re-yield items from an async iterator through a bounded queue.
+
+    A background task pulls items from the source into an asyncio.Queue of at most
+    maxsize items. When the consumer falls behind, the queue fills up and the source
+    is paused until there is room again. If there is still no room after put_timeout
+    seconds, the source is closed and TimeoutError is raised once the queued items
+    have been consumed.
+
+    Args:
+        source (AsyncIterator[T]): The iterator to read from, e.g. an LLM token stream.
+        maxsize (int): Maximum number of items held in memory.
+        put_timeout (float): Seconds to wait for room in the queue before giving up.
+
+    Yields:
+        T: The items of the source, in order.
+
+    Raises:
+        TimeoutError: If the consumer stalled for longer than put_timeout.
+        Exception: Any error raised by the source.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+    error: Optional[BaseException] = None
+
+    async def produce() -> None:
+        nonlocal error
+        try:
+            async for item in source:
+                try:
+                    await asyncio.wait_for(queue.put(item), timeout=put_timeout)
+                except TimeoutError:
+                    # The bare TimeoutError has an empty message, which reads as a normal done frame
+                    raise TimeoutError("stream aborted: client too slow") from None
+        except Exception as e:
+            error = e
+        finally:
+            aclose = getattr(source, "aclose", None)
+            if aclose is not None:
+                await aclose()
+        # Not reached when cancelled, so a full queue can't keep the task alive
+        await queue.put(_END)
+
+    producer = asyncio.create_task(produce())
+    try:
+        while (item := await queue.get()) is not _END:
+            yield item
+        if error is not None:
+            raise error
+    finally:
+        producer.cancel()
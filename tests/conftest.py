@@ -0,0 +1,8 @@
+"""Shared test configuration."""
+
+import os
+
+# Settings are read at import time; run against the test environment without external services
+os.environ.setdefault("APP_ENV", "test")
+os.environ.setdefault("POSTGRES_URL", "sqlite://")
+os.environ.setdefault("LLM_API_KEY", "test-key")
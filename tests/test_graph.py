@@ -0,0 +1,101 @@
+"""Tests for the history pruning of the LangGraph agent."""
+
+import asyncio
+import uuid
+
+import pytest
+from langchain_core.messages import (
+    AIMessage,
+    HumanMessage,
+    ToolMessage,
+)
+
+from app.core.langraph import graph
+from app.core.langraph.graph import LangGraphAgent
+from app.schemas import GraphState
+
+
+@pytest.fixture
+def agent(monkeypatch):
+    """Agent with a stubbed summary model and word-based token counting."""
+    monkeypatch.setattr(graph.settings, "SUMMARY_TRIGGER_TOKENS", 10)
+    monkeypatch.setattr(graph.settings, "SUMMARY_KEEP_MESSAGES", 2)
+    monkeypatch.setattr(graph, "count_tokens", lambda messages: sum(len(str(m.content).split()) for m in messages))
+
+    agent = LangGraphAgent()
+    agent.summarize_calls = []
+
+    async def summarize(messages, previous_summary=None):
+        agent.summarize_calls.append(([m.id for m in messages], previous_summary))
+        return f"summary {len(agent.summarize_calls)}"
+
+    agent.summarize = summarize
+    return agent
+
+
+def _history(count: int, prefix: str = "m") -> list:
+    """Alternate human and AI messages of three words each."""
+    return [
+        (HumanMessage if i % 2 == 0 else AIMessage)(content="one two three", id=f"{prefix}{i}") for i in range(count)
+    ]
+
+
+def _prune(agent: LangGraphAgent, session_id: str, messages: list):
+    return asyncio.run(agent._prune_history(GraphState(messages=messages, session_id=session_id)))
+
+
+def test_short_history_is_not_summarized(agent):
+    """Histories under the trigger are sent verbatim without a summary."""
+    messages = _history(3)
+    assert _prune(agent, str(uuid.uuid4()), messages) == (messages, None)
+    assert agent.summarize_calls == []
+
+
+def test_split_moves_back_to_a_human_message(agent):
+    """The verbatim part starts on a human message so tool results keep their call."""
+    messages = _history(4) + [
+        AIMessage(content="", id="call", tool_calls=[{"name": "news_impact_analysis", "args": {}, "id": "t1"}]),
+        ToolMessage(content="tool output", id="result", tool_call_id="t1"),
+    ]
+    kept, summary = _prune(agent, str(uuid.uuid4()), messages)
+    # Keeping the last two messages would start on the tool call, so the split moves back to m2
+    assert [m.id for m in kept] == ["m2", "m3", "call", "result"]
+    assert summary == "summary 1"
+    assert agent.summarize_calls == [(["m0", "m1"], None)]
+
+
+def test_cached_summary_is_reused(agent):
+    """A cached summary still matching the history is reused without calling the model."""
+    session_id = str(uuid.uuid4())
+    messages = _history(6)
+    first = _prune(agent, session_id, messages)
+    assert agent.summarize_calls == [(["m0", "m1", "m2", "m3"], None)]
+
+    messages.append(HumanMessage(content="next", id="m6"))
+    kept, summary = _prune(agent, session_id, messages)
+    assert summary == first[1]
+    assert [m.id for m in kept] == ["m4", "m5", "m6"]
+    assert len(agent.summarize_calls) == 1
+
+
+def test_cached_summary_is_ignored_when_history_changed(agent):
+    """A cached summary whose last message is no longer in place is discarded."""
+    session_id = str(uuid.uuid4())
+    _prune(agent, session_id, _history(6))
+
+    rewritten = _history(6, prefix="x")
+    _prune(agent, session_id, rewritten)
+    assert agent.summarize_calls[1] == (["x0", "x1", "x2", "x3"], None)
+
+
+def test_previous_summary_is_merged(agent):
+    """Messages after a cached summary are folded into it once they go over the trigger."""
+    session_id = str(uuid.uuid4())
+    messages = _history(6)
+    _prune(agent, session_id, messages)
+
+    messages += _history(4, prefix="n")
+    kept, summary = _prune(agent, session_id, messages)
+    assert agent.summarize_calls[1] == (["m4", "m5", "n0", "n1"], "summary 1")
+    assert [m.id for m in kept] == ["n2", "n3"]
+    assert summary == "summary 2"
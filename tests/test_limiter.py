@@ -0,0 +1,61 @@
+"""Tests for the in-process token bucket limiter."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.core import limiter
+from app.core.limiter import TokenBucket
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable monotonic clock for the limiter, with Redis disabled."""
+    now = [1000.0]
+    monkeypatch.setattr(limiter, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    monkeypatch.setattr(limiter.settings, "REDIS_URL", "")
+    return now
+
+
+def test_tokens_are_taken_until_the_bucket_is_empty(clock):
+    """Requests are admitted while tokens last, then told how long to wait."""
+    bucket = TokenBucket(capacity=100, refill_rate=10)
+    assert asyncio.run(bucket.acquire("user:1", 60)) == 0
+    assert asyncio.run(bucket.acquire("user:1", 60)) == pytest.approx(2.0)
+
+
+def test_bucket_refills_up_to_capacity(clock):
+    """Tokens come back at refill_rate per second, never above capacity."""
+    bucket = TokenBucket(capacity=100, refill_rate=10)
+    asyncio.run(bucket.acquire("user:1", 100))
+    clock[0] += 5
+    assert asyncio.run(bucket.acquire("user:1", 50)) == 0
+    clock[0] += 3600
+    assert asyncio.run(bucket.acquire("user:1", 100)) == 0
+    assert asyncio.run(bucket.acquire("user:1", 1)) > 0
+
+
+def test_cost_is_capped_at_capacity(clock):
+    """A request costing more than the capacity is still admitted by a full bucket."""
+    bucket = TokenBucket(capacity=100, refill_rate=10)
+    assert asyncio.run(bucket.acquire("user:1", 10000)) == 0
+
+
+def test_check_rejects_with_retry_after(clock):
+    """An exhausted bucket raises 429 with a rounded-up Retry-After header."""
+    bucket = TokenBucket(capacity=100, refill_rate=3)
+    asyncio.run(bucket.check("user:1", 100))
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(bucket.check("user:1", 10))
+    assert exc_info.value.status_code == 429
+    assert exc_info.value.headers == {"Retry-After": "4"}
+
+
+def test_least_recently_used_bucket_is_evicted(clock):
+    """Only local_maxsize buckets are kept, dropping the least recently used one."""
+    bucket = TokenBucket(capacity=100, refill_rate=10, local_maxsize=2)
+    for key in ("a", "b", "a", "c"):
+        asyncio.run(bucket.acquire(key, 10))
+    assert list(bucket._buckets) == ["a", "c"]
@@ -0,0 +1,48 @@
+"""Tests for the bounded streaming helper."""
+
+import asyncio
+
+import pytest
+
+from app.utils.streaming import bounded_stream
+
+
+async def _numbers(count: int):
+    for i in range(count):
+        yield i
+
+
+async def _collect(stream, delay: float = 0.0) -> list:
+    items = []
+    async for item in stream:
+        items.append(item)
+        await asyncio.sleep(delay)
+    return items
+
+
+def test_items_are_forwarded_in_order():
+    """Items pass through the bounded queue unchanged and in order."""
+    assert asyncio.run(_collect(bounded_stream(_numbers(10), maxsize=2, put_timeout=1.0))) == list(range(10))
+
+
+def test_stalled_consumer_gets_explicit_timeout():
+    """A consumer that stops reading gets a TimeoutError with a readable message."""
+    async def consume():
+        stream = bounded_stream(_numbers(100), maxsize=1, put_timeout=0.01)
+        first = await stream.__anext__()
+        await asyncio.sleep(0.1)
+        await _collect(stream)
+        return first
+
+    with pytest.raises(TimeoutError, match="stream aborted: client too slow"):
+        asyncio.run(consume())
+
+
+def test_source_errors_are_reraised():
+    """Errors raised by the source reach the consumer."""
+    async def failing():
+        yield 1
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError, match="boom"):
+        asyncio.run(_collect(bounded_stream(failing(), maxsize=4, put_timeout=1.0)))
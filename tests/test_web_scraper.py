@@ -0,0 +1,130 @@
+"""Tests for the news article content extraction."""
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.core.langraph.tools import web_scraper
+from app.core.langraph.tools.web_scraper import (
+    NewsImpactTool,
+    UnsafeURLError,
+    _extract_main_content,
+    _PublicHostTransport,
+    _resolve_public_address,
+)
+
+
+def test_article_text_does_not_leak_into_siblings():
+    """Text after the <article> element is not part of the extracted content."""
+    html = (
+        b"<html><body>"
+        b"<article><p>Short story text.</p></article>"
+        b"<aside>Related stories</aside>"
+        b"<footer>Copyright notice</footer>"
+        b"</body></html>"
+    )
+    assert _extract_main_content(html, 500) == "Short story text."
+
+
+def test_class_and_id_match_case_insensitively():
+    """Content containers match by class or id regardless of case."""
+    by_class = b'<body><nav>Menu</nav><div class="ArticleBody">Body by class</div></body>'
+    by_id = b'<body><nav>Menu</nav><div id="Main-Content">Body by id</div></body>'
+    assert _extract_main_content(by_class, 500) == "Body by class"
+    assert _extract_main_content(by_id, 500) == "Body by id"
+
+
+def test_script_and_style_text_is_skipped():
+    """Script and style text inside the article is ignored."""
+    html = b"<article><script>var x = 1;</script><style>p {}</style><p>Visible text</p></article>"
+    assert _extract_main_content(html, 500) == "Visible text"
+
+
+def test_max_words_caps_output():
+    """Extraction stops after max_words words."""
+    html = b"<article><p>one two three</p><p>four five</p></article>"
+    assert _extract_main_content(html, 4) == "one two three four"
+
+
+def test_empty_article_falls_through_to_next_candidate():
+    """An empty <article> loses to a later content container with text."""
+    html = (
+        b"<body><article></article>"
+        b'<div class="content">Real article body</div>'
+        b"<footer>Site footer</footer></body>"
+    )
+    assert _extract_main_content(html, 500) == "Real article body"
+
+
+def test_no_content_returns_none():
+    """A document without text yields None."""
+    assert _extract_main_content(b"<html><body></body></html>", 500) is None
+
+
+def test_unsafe_hosts_are_rejected():
+    """Loopback, private, link-local and unspecified addresses are refused."""
+    for host in ("127.0.0.1", "localhost", "::1", "10.0.0.5", "192.168.1.1", "169.254.169.254", "::ffff:127.0.0.1", "0.0.0.0"):
+        with pytest.raises(UnsafeURLError):
+            asyncio.run(_resolve_public_address(host, 80))
+
+
+def test_public_host_is_allowed():
+    """A public address passes the check and is returned for the connection."""
+    assert asyncio.run(_resolve_public_address("93.184.216.34", 443)) == "93.184.216.34"
+
+
+def _pinned_client(monkeypatch, handler) -> httpx.AsyncClient:
+    """Client that resolves news.example.com to a public address and serves requests from handler."""
+    resolve = _resolve_public_address
+
+    async def fake_resolve(host: str, port: int) -> str:
+        return "93.184.216.34" if host == "news.example.com" else await resolve(host, port)
+
+    monkeypatch.setattr(web_scraper, "_resolve_public_address", fake_resolve)
+    return httpx.AsyncClient(transport=_PublicHostTransport(httpx.MockTransport(handler)), follow_redirects=True)
+
+
+def test_connection_is_pinned_to_the_checked_address(monkeypatch):
+    """The request goes to the checked address while keeping the original host for Host and SNI."""
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        return httpx.Response(200, text="ok")
+
+    async def fetch():
+        async with _pinned_client(monkeypatch, handler) as client:
+            return await client.get("https://news.example.com/story")
+
+    response = asyncio.run(fetch())
+    assert str(response.url) == "https://news.example.com/story"
+    assert seen[0].url.host == "93.184.216.34"
+    assert seen[0].headers["Host"] == "news.example.com"
+    assert seen[0].extensions["sni_hostname"] == "news.example.com"
+
+
+def test_redirect_to_unsafe_host_is_rejected(monkeypatch):
+    """A redirect to a non-public address is refused."""
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(302, headers={"Location": "http://127.0.0.1/admin"})
+
+    async def fetch():
+        async with _pinned_client(monkeypatch, handler) as client:
+            await client.get("https://news.example.com/story")
+
+    with pytest.raises(UnsafeURLError):
+        asyncio.run(fetch())
+
+
+def test_sync_run_fetches_with_its_own_client(monkeypatch):
+    """The sync tool path works outside the app's event loop."""
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, html="<article><p>Rates were cut today.</p></article>")
+
+    monkeypatch.setattr(
+        web_scraper, "_new_scraper_client", lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+    result = NewsImpactTool().invoke({"url": "https://news.example.com/rates", "field": "finance"})
+    assert "News Content: Rates were cut today." in result
+    assert "finance sector" in result